@@ -1,17 +1,10 @@
 import pandas as pd
 import numpy as np
-import pdfplumber
 import os
+from src.extract import extract_text_from_pdf
 from src.parser import parse_race_form
 from src.features import compute_features  # ✅ Enhanced scoring logic
 
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-    return text
-
 # 🚀 Start pipeline
 print("🚀 Starting Greyhound Analytics")
 
@@ -33,15 +26,14 @@ for pdf_file in pdf_files:
     raw_text = extract_text_from_pdf(pdf_path)
     df = parse_race_form(raw_text)
 
-    # ✅ Convert DLR to numeric to avoid type errors
-    df["DLR"] = pd.to_numeric(df["DLR"], errors="coerce")
-
-    # ✅ Apply enhanced scoring
+    # ✅ Apply enhanced scoring (also coerces DLR/CareerStarts/Distance to numeric)
     df = compute_features(df)
     all_dogs.append(df)
 
 # ✅ Combine all dogs
 combined_df = pd.concat(all_dogs, ignore_index=True)
+# Categorical Track for the sorts and groupbys below
+combined_df["Track"] = combined_df["Track"].astype("category")
 print(f"🐾 Total dogs parsed: {len(combined_df)}")
 
 # ✅ Save full parsed form
@@ -54,7 +46,7 @@ ranked.to_csv("outputs/ranked.csv", index=False)
 print("📊 Saved ranked dogs → outputs/ranked.csv")
 
 # ✅ Save top picks across all tracks
-picks = ranked.groupby(["Track", "RaceNumber"]).head(1).reset_index(drop=True)
+picks = ranked.groupby(["Track", "RaceNumber"], sort=False, observed=True).head(1).reset_index(drop=True)
 picks = picks.sort_values("FinalScore", ascending=False)
 
 # Reorder columns
@@ -68,7 +60,7 @@ print("🎯 Saved top picks → outputs/picks.csv")
 
 # ✅ Display top picks
 print("\n🏁 Top Picks Across All Tracks:")
-for _, row in picks.iterrows():
+for row in picks[["Track", "RaceNumber", "DogName", "FinalScore"]].itertuples(index=False):
     print(f"{row.Track} | Race {row.RaceNumber} | {row.DogName} | Score: {round(row.FinalScore, 3)}")
 
 print("\n📌 Press Enter to exit...")
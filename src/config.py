@@ -1,4 +1,7 @@
 # config.py
+PDF_DIR = "data"          # Form guide PDFs
+OUTPUT_DIR = "outputs"     # Generated CSV/Excel output
+
 SCORING_WEIGHTS = {
     "win": 5,               # Points per career win
     "place": 2,             # Points per career place (2nd/3rd)
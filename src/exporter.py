@@ -1,40 +1,50 @@
 import pandas as pd
+import numpy as np
 import os
+from openpyxl import Workbook
+
+# Strict export column order, and the same names as a set for the extra-key audit
+EXPORT_COLUMNS = (
+    "Track", "RaceNumber", "RaceDate", "RaceTime", "Distance",
+    "Box", "DogsName", "form_code", "age_sex", "weight", "trainer",
+    "wins", "places", "starts", "PrizeMoney", "KmH", "experience_level",
+    "FinalScore", "Bet", "strike_rate", "win_percentage", "place_percentage",
+    "consistency_rate", "consistent_places", "has_dnf", "has_win", "has_place",
+    "recent_races", "recent_positions", "avg_recent_position",
+    "best_recent_position", "worst_recent_position", "form_trend",
+    "source_file", "Date"
+)
+EXPORT_COLUMN_SET = frozenset(EXPORT_COLUMNS)
+# Rows converted to Python values per block while writing the sheet
+EXPORT_CHUNK_ROWS = 2048
 
 def export_to_excel(dogs, output_path):
-    # Flatten list fields
-    for dog in dogs:
-        dog["recent_positions"] = ", ".join(map(str, dog.get("recent_positions", [])))
+    # Flatten list fields and audit for extra keys
+    for i, dog in enumerate(dogs):
+        # Positions that are already a string were flattened before
+        positions = dog.get("recent_positions", ())
+        if type(positions) is not str:
+            dog["recent_positions"] = ", ".join(map(str, positions))
         dog["form_trend"] = str(dog.get("form_trend", ""))
         dog["has_win"] = int(dog.get("has_win", 0))
         dog["has_place"] = int(dog.get("has_place", 0))
 
-    # Define strict column order
-    columns = [
-        "Track", "RaceNumber", "RaceDate", "RaceTime", "Distance",
-        "Box", "DogsName", "form_code", "age_sex", "weight", "trainer",
-        "wins", "places", "starts", "PrizeMoney", "KmH", "experience_level",
-        "FinalScore", "Bet", "strike_rate", "win_percentage", "place_percentage",
-        "consistency_rate", "consistent_places", "has_dnf", "has_win", "has_place",
-        "recent_races", "recent_positions", "avg_recent_position",
-        "best_recent_position", "worst_recent_position", "form_trend",
-        "source_file", "Date"
-    ]
-
-    # Fill missing keys with None
-    for dog in dogs:
-        for col in columns:
-            if col not in dog:
-                dog[col] = None
-
-    # Audit: log any extra keys
-    for i, dog in enumerate(dogs):
-        extras = set(dog.keys()) - set(columns)
+        extras = dog.keys() - EXPORT_COLUMN_SET
         if extras:
             print(f"WARNING: Extra keys in dog #{i} ({dog.get('DogsName', 'Unknown')}): {extras}")
 
-    df = pd.DataFrame(dogs)[columns]
+    # Build only the export columns; keys missing from a dog become empty cells
+    df = pd.DataFrame.from_records(dogs, columns=list(EXPORT_COLUMNS))
     filename = f"greyhound_analysis_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     filepath = os.path.join(output_path, filename)
-    df.to_excel(filepath, index=False)
+
+    # Write-only workbook, filled a block of rows at a time
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(EXPORT_COLUMNS)
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        values = df.iloc[start:start + EXPORT_CHUNK_ROWS].to_numpy(dtype=object)
+        for row in np.where(pd.isna(values), None, values).tolist():
+            ws.append(row)
+    wb.save(filepath)
     print(f"EXCEL SAVED: {filepath}")
@@ -1,6 +1,12 @@
 import os
 import pdfplumber
 
+def extract_text_from_pdf(pdf_path):
+    # Pages with no text layer are skipped
+    with pdfplumber.open(pdf_path) as pdf:
+        pages = [page.extract_text() for page in pdf.pages]
+    return "".join(f"{page_text}\n" for page_text in pages if page_text)
+
 def extract_text_from_latest_pdf(folder):
     if not os.path.exists(folder):
         print(f"❌ Folder not found: {folder}")
@@ -15,13 +21,8 @@ def extract_text_from_latest_pdf(folder):
     pdf_files.sort(key=lambda f: os.path.getmtime(os.path.join(folder, f)), reverse=True)
     pdf_path = os.path.join(folder, pdf_files[0])
 
-    text = ""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        text = extract_text_from_pdf(pdf_path)
     except Exception as e:
         print(f"⚠️ Error reading PDF: {e}")
         return None
@@ -1,150 +1,218 @@
 import pandas as pd
 import numpy as np
+from itertools import chain
+
+# Confidence tiers, strictest first: (min top score, min separation score)
+TIER_LABELS = ("Tier 1", "Tier 2", "Tier 3", "Tier 4")
+TIER_THRESHOLDS = ((42, 3), (40, 2), (38, 1.5))
+BET_TIERS = ("Tier 1", "Tier 2")
+_BET_TIER_CODES = tuple(TIER_LABELS.index(tier) for tier in BET_TIERS)
+
+SUITED_DISTANCES = (515, 595)
+# Parsed columns that may arrive as text ("FSH", "-") and are coerced to numbers, NaN when unreadable
+NUMERIC_COLUMNS = ("DLR", "CareerStarts", "Distance")
+
+# Race-type adaptive weighting
+RACE_TYPE_WEIGHTS = {
+    "Sprint": {
+        "EarlySpeedIndex": 0.30,
+        "Speed_kmh": 0.20,
+        "ConsistencyIndex": 0.10,
+        "FinishConsistency": 0.05,
+        "PrizeMoney": 0.10,
+        "RecentFormBoost": 0.10,
+        "BoxBiasFactor": 0.10,
+        "TrainerStrikeRate": 0.05,
+        "DistanceSuit": 0.05,
+        "TrackConditionAdj": 0.05
+    },
+    "Middle": {
+        "EarlySpeedIndex": 0.25,
+        "Speed_kmh": 0.20,
+        "ConsistencyIndex": 0.15,
+        "FinishConsistency": 0.05,
+        "PrizeMoney": 0.10,
+        "RecentFormBoost": 0.10,
+        "BoxBiasFactor": 0.05,
+        "TrainerStrikeRate": 0.05,
+        "DistanceSuit": 0.05,
+        "TrackConditionAdj": 0.05
+    },
+    "Long": {
+        "EarlySpeedIndex": 0.20,
+        "Speed_kmh": 0.15,
+        "ConsistencyIndex": 0.20,
+        "FinishConsistency": 0.10,
+        "PrizeMoney": 0.10,
+        "RecentFormBoost": 0.10,
+        "BoxBiasFactor": 0.05,
+        "TrainerStrikeRate": 0.05,
+        "DistanceSuit": 0.05,
+        "TrackConditionAdj": 0.05
+    }
+}
+
+# Race-type distance bands in metres: Sprint below SPRINT_MAX_DISTANCE,
+# Middle up to and including MIDDLE_MAX_DISTANCE, Long beyond
+SPRINT_MAX_DISTANCE = 400
+MIDDLE_MAX_DISTANCE = 500
+
+# The same weights as a (race type x feature) matrix, rows in RACE_TYPES order
+RACE_TYPES = ("Sprint", "Middle", "Long")
+SCORE_FEATURES = tuple(RACE_TYPE_WEIGHTS["Sprint"])
+_WEIGHT_MATRIX = np.array([[RACE_TYPE_WEIGHTS[race_type][f] for f in SCORE_FEATURES] for race_type in RACE_TYPES])
+
+def race_type_codes(distance):
+    # Row index into _WEIGHT_MATRIX (a RACE_TYPES position) for each distance
+    distance = np.asarray(distance, dtype=np.float64)
+    return np.select([distance < SPRINT_MAX_DISTANCE, distance <= MIDDLE_MAX_DISTANCE], [0, 1], default=2)
+
+def padded_lists(lists):
+    # Ragged per-dog lists as an (N, longest) float array padded with NaN, plus each list's length;
+    # a missing cell (NaN where the parser found no stat line) counts as an empty list
+    lists = [() if pd.api.types.is_scalar(x) and pd.isna(x) else x for x in lists]
+    counts = np.fromiter(map(len, lists), dtype=np.intp, count=len(lists))
+    padded = np.full((len(lists), counts.max(initial=0)), np.nan)
+    # Fill each row's leading slots from one flat array
+    flat = np.fromiter(chain.from_iterable(lists), dtype=np.float64, count=counts.sum())
+    padded[np.arange(padded.shape[1]) < counts[:, None]] = flat
+    return padded, counts
 
 def compute_features(df):
-    df = df.copy()
+    # New and coerced columns, attached in one assign at the end; the caller's frame is left as is
+    out = {}
 
     # Ensure numeric types
-    df["DLR"] = pd.to_numeric(df["DLR"], errors="coerce")
-    df["CareerStarts"] = pd.to_numeric(df["CareerStarts"], errors="coerce")
-    df["Distance"] = pd.to_numeric(df["Distance"], errors="coerce")
+    out.update(df[list(NUMERIC_COLUMNS)].apply(pd.to_numeric, errors="coerce").items())
+
+    # Input arrays
+    distance = out["Distance"].to_numpy(dtype=np.float64)
+    starts = out["CareerStarts"].to_numpy(dtype=np.float64)
+    dlr = out["DLR"].to_numpy(dtype=np.float64)
+    wins = df["CareerWins"].to_numpy(dtype=np.float64)
 
     # Placeholder values — replace with parsed metrics later
-    df["BestTimeSec"] = 22.5
-    df["SectionalSec"] = 8.5
-    df["Last3TimesSec"] = [[22.65, 22.52, 22.77]] * len(df)
-    df["Margins"] = [[5.0, 6.3, 10.3]] * len(df)
-    df["BoxBiasFactor"] = 0.1
-    df["TrackConditionAdj"] = 1.0
-
-    # Derived metrics
-    df["Speed_kmh"] = (df["Distance"] / df["BestTimeSec"]) * 3.6
-    df["EarlySpeedIndex"] = df["Distance"] / df["SectionalSec"]
-    df["FinishConsistency"] = df["Last3TimesSec"].apply(lambda x: np.std(x))
-    df["MarginAvg"] = df["Margins"].apply(lambda x: np.mean(x))
-    df["FormMomentum"] = df["Margins"].apply(lambda x: np.mean(np.diff(x)) if len(x) >= 2 else 0)
-
-    # Consistency Index
-    df["ConsistencyIndex"] = df.apply(
-        lambda row: row["CareerWins"] / row["CareerStarts"] if row["CareerStarts"] > 0 else 0,
-        axis=1
+    out["BestTimeSec"] = 22.5
+    out["SectionalSec"] = 8.5
+    out["Last3TimesSec"] = [[22.65, 22.52, 22.77]] * len(df)
+    out["Margins"] = [[5.0, 6.3, 10.3]] * len(df)
+    out["BoxBiasFactor"] = 0.1
+    out["TrackConditionAdj"] = 1.0
+
+    # Derived metrics (NaN where the time is missing or zero)
+    best = np.full(len(df), out["BestTimeSec"], dtype=np.float64)
+    sectional = np.full(len(df), out["SectionalSec"], dtype=np.float64)
+    speed = np.divide(distance, best, out=np.full(len(df), np.nan), where=best > 0)
+    speed *= 3.6
+    out["Speed_kmh"] = speed
+    out["EarlySpeedIndex"] = np.divide(distance, sectional, out=np.full(len(df), np.nan), where=sectional > 0)
+    # Run-list metrics over NaN-padded rows
+    last3, _ = padded_lists(out["Last3TimesSec"])
+    margins, margin_counts = padded_lists(out["Margins"])
+    out["FinishConsistency"] = np.nanstd(last3, axis=1)
+    out["MarginAvg"] = np.nanmean(margins, axis=1)
+    # Mean step between consecutive margins; dogs with fewer than two margins get 0
+    steps = margin_counts - 1
+    out["FormMomentum"] = np.divide(
+        np.nansum(np.diff(margins, axis=1), axis=1), steps,
+        out=np.zeros(len(df)), where=steps > 0
     )
 
+    # Consistency Index (win rate; 0 for unraced dogs)
+    out["ConsistencyIndex"] = np.divide(wins, starts, out=np.zeros(len(df)), where=starts > 0)
+
     # Recent Form Boost
-    df["RecentFormBoost"] = df.apply(
-        lambda row: 1.0 if row["DLR"] <= 5 and row["CareerWins"] > 0 else 0.5 if row["DLR"] <= 10 else 0,
-        axis=1
-    )
+    out["RecentFormBoost"] = np.select([(dlr <= 5) & (wins > 0), dlr <= 10], [1.0, 0.5], default=0.0)
 
     # Distance Suitability
-    df["DistanceSuit"] = df["Distance"].apply(lambda x: 1.0 if x in [515, 595] else 0.7)
+    out["DistanceSuit"] = np.where(np.isin(distance, SUITED_DISTANCES), 1.0, 0.7)
 
     # Fallbacks
-    df["TrainerStrikeRate"] = df.get("TrainerStrikeRate", pd.Series([0.15] * len(df)))
-    df["RestFactor"] = df.get("RestFactor", pd.Series([0.8] * len(df)))
+    if "TrainerStrikeRate" not in df:
+        out["TrainerStrikeRate"] = 0.15
+    if "RestFactor" not in df:
+        out["RestFactor"] = 0.8
 
     # Overexposure Penalty
-    df["OverexposedPenalty"] = df["CareerStarts"].apply(lambda x: -0.1 if x > 80 else 0)
-
-    # Race-type adaptive weighting
-    def get_weights(distance):
-        if distance < 400:  # Sprint
-            return {
-                "EarlySpeedIndex": 0.30,
-                "Speed_kmh": 0.20,
-                "ConsistencyIndex": 0.10,
-                "FinishConsistency": 0.05,
-                "PrizeMoney": 0.10,
-                "RecentFormBoost": 0.10,
-                "BoxBiasFactor": 0.10,
-                "TrainerStrikeRate": 0.05,
-                "DistanceSuit": 0.05,
-                "TrackConditionAdj": 0.05
-            }
-        elif distance <= 500:  # Middle
-            return {
-                "EarlySpeedIndex": 0.25,
-                "Speed_kmh": 0.20,
-                "ConsistencyIndex": 0.15,
-                "FinishConsistency": 0.05,
-                "PrizeMoney": 0.10,
-                "RecentFormBoost": 0.10,
-                "BoxBiasFactor": 0.05,
-                "TrainerStrikeRate": 0.05,
-                "DistanceSuit": 0.05,
-                "TrackConditionAdj": 0.05
-            }
-        else:  # Long
-            return {
-                "EarlySpeedIndex": 0.20,
-                "Speed_kmh": 0.15,
-                "ConsistencyIndex": 0.20,
-                "FinishConsistency": 0.10,
-                "PrizeMoney": 0.10,
-                "RecentFormBoost": 0.10,
-                "BoxBiasFactor": 0.05,
-                "TrainerStrikeRate": 0.05,
-                "DistanceSuit": 0.05,
-                "TrackConditionAdj": 0.05
-            }
-
-    # FinalScore calculation
-    final_scores = []
-    for _, row in df.iterrows():
-        w = get_weights(row["Distance"])
-        score = (
-            row["EarlySpeedIndex"] * w["EarlySpeedIndex"] +
-            row["Speed_kmh"] * w["Speed_kmh"] +
-            row["ConsistencyIndex"] * w["ConsistencyIndex"] +
-            row["FinishConsistency"] * w["FinishConsistency"] +
-            (row["PrizeMoney"] / 1000) * w["PrizeMoney"] +
-            row["RecentFormBoost"] * w["RecentFormBoost"] +
-            row["BoxBiasFactor"] * w["BoxBiasFactor"] +
-            row["TrainerStrikeRate"] * w["TrainerStrikeRate"] +
-            row["DistanceSuit"] * w["DistanceSuit"] +
-            row["TrackConditionAdj"] * w["TrackConditionAdj"] +
-            row["OverexposedPenalty"]
+    out["OverexposedPenalty"] = np.where(starts > 80, -0.1, 0.0)
+
+    # FinalScore calculation, weighted by race type
+    weights = _WEIGHT_MATRIX[race_type_codes(distance)]
+    final_scores = np.zeros(len(df))
+    for i, feature in enumerate(SCORE_FEATURES):
+        values = np.asarray(out[feature] if feature in out else df[feature], dtype=np.float64)
+        if feature == "PrizeMoney":
+            values = values / 1000
+        final_scores += values * weights[:, i]
+
+    out["FinalScore"] = final_scores + out["OverexposedPenalty"]
+    return df.assign(**out)
+
+def classify_tiers(top_scores, separation_scores, thresholds=TIER_THRESHOLDS):
+    # Tier codes for all races in one pass: 0 = Tier 1 ... len(thresholds) = no tier met
+    # thresholds can be swapped per call, e.g. when sweeping cut-offs over a card,
+    # but need one row per tier above the last so every code maps onto TIER_LABELS
+    if len(thresholds) != len(TIER_LABELS) - 1:
+        raise ValueError(
+            f"thresholds needs {len(TIER_LABELS) - 1} (score, separation) rows, one per tier in "
+            f"{TIER_LABELS[:-1]}; got {len(thresholds)}"
         )
-        final_scores.append(score)
-
-    df["FinalScore"] = final_scores
-    return df
-
-def generate_trifecta_table(df):
-    trifecta_rows = []
-
-    for (track, race), group in df.groupby(["Track", "RaceNumber"]):
-        top3 = group.sort_values("FinalScore", ascending=False).head(3)
-        if len(top3) < 3:
-            continue
-
-        scores = top3["FinalScore"].values
-        separation_score = (scores[0] - scores[1]) + (scores[1] - scores[2])
-
-        # Confidence tiering
-        if scores[0] > 42 and separation_score > 3:
-            tier = "Tier 1"
-        elif scores[0] > 40 and separation_score > 2:
-            tier = "Tier 2"
-        elif scores[0] > 38 and separation_score > 1.5:
-            tier = "Tier 3"
-        else:
-            tier = "Tier 4"
-
-        trifecta_rows.append({
-            "Track": track,
-            "RaceNumber": race,
-            "Dog1": top3.iloc[0]["DogName"],
-            "Dog2": top3.iloc[1]["DogName"],
-            "Dog3": top3.iloc[2]["DogName"],
-            "Score1": scores[0],
-            "Score2": scores[1],
-            "Score3": scores[2],
-            "SeparationScore": round(separation_score, 3),
-            "ConfidenceTier": tier,
-            "BetFlag": "BET" if tier in ["Tier 1", "Tier 2"] else "NO BET"
-        })
-
-    trifecta_df = pd.DataFrame(trifecta_rows)
+    top = np.asarray(top_scores, dtype=np.float64)
+    separation = np.asarray(separation_scores, dtype=np.float64)
+    codes = np.full(len(top), len(thresholds), dtype=np.int8)
+
+    # Only races clearing the weakest top-score bar can reach a better tier
+    candidates = np.flatnonzero(top > min(score for score, _ in thresholds))
+    top, separation = top[candidates], separation[candidates]
+    conditions = [(top > score) & (separation > margin) for score, margin in thresholds]
+    codes[candidates] = np.select(conditions, range(len(thresholds)), default=len(thresholds))
+    return codes
+
+def build_race_features(df):
+    # Per-race top-three names and scores, reusable by any race-level table
+    race_keys = ["Track", "RaceNumber"]
+    df = df[race_keys + ["DogName", "FinalScore"]]
+
+    # Categorical Track for grouping
+    if not isinstance(df["Track"].dtype, pd.CategoricalDtype):
+        df = df.assign(Track=df["Track"].astype("category"))
+
+    # Runners in each race, best score first
+    ranked = df.sort_values(race_keys + ["FinalScore"], ascending=[True, True, False], kind="stable")
+    grouped = ranked.groupby(race_keys, sort=False, observed=True)
+    place = grouped.cumcount()
+    field_size = grouped["FinalScore"].transform("size")
+
+    # Keep the top three of every race with a full trifecta, one race per three rows
+    top3 = ranked[(place < 3) & (field_size >= 3)]
+    races = top3.iloc[::3]
+
+    names = top3["DogName"].to_numpy(dtype=object).reshape(-1, 3)
+    scores = top3["FinalScore"].to_numpy(dtype=np.float64).reshape(-1, 3)
+
+    return pd.DataFrame({
+        "Track": races["Track"].to_numpy(),
+        "RaceNumber": races["RaceNumber"].to_numpy(),
+        "Dog1": names[:, 0],
+        "Dog2": names[:, 1],
+        "Dog3": names[:, 2],
+        "Score1": scores[:, 0],
+        "Score2": scores[:, 1],
+        "Score3": scores[:, 2],
+        "SeparationScore": (scores[:, 0] - scores[:, 1]) + (scores[:, 1] - scores[:, 2])
+    })
+
+def generate_trifecta_table(df, race_features=None, thresholds=TIER_THRESHOLDS):
+    if race_features is None:
+        race_features = build_race_features(df)
+
+    trifecta_df = race_features.copy()
+    separation_scores = trifecta_df["SeparationScore"].to_numpy()
+    trifecta_df["SeparationScore"] = np.round(separation_scores, 3)
+
+    # Confidence tiering
+    tiers = classify_tiers(trifecta_df["Score1"], separation_scores, thresholds)
+    trifecta_df["ConfidenceTier"] = np.array(TIER_LABELS)[tiers]
+    trifecta_df["BetFlag"] = np.where(np.isin(tiers, _BET_TIER_CODES), "BET", "NO BET")
     trifecta_df = trifecta_df.sort_values("SeparationScore", ascending=False)
     return trifecta_df
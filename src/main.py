@@ -1,4 +1,5 @@
 import os
+from collections import Counter
 from parser import parse_pdf_form
 from exporter import export_to_excel
 
@@ -53,11 +54,9 @@ def main():
     print("CALCULATING SCORES...")
     print("CALCULATING BETS...")
 
-    bets = [d for d in all_dogs if d["BetType"] == "YES"]
-    places = [d for d in all_dogs if d["BetType"] == "PLACE"]
-    passes = [d for d in all_dogs if d["BetType"] == "PASS"]
+    bet_counts = Counter(d["BetType"] for d in all_dogs)
 
-    print(f"   BETS - YES: {len(bets)}, PLACE: {len(places)}, PASS: {len(passes)}")
+    print(f"   BETS - YES: {bet_counts['YES']}, PLACE: {bet_counts['PLACE']}, PASS: {bet_counts['PASS']}")
     print("SUCCESS: Single winner per race!\n")
 
     print("SAVING EXCEL...")
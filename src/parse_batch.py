@@ -0,0 +1,25 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src.parser import parse_race_form
+
+def parse_all(texts, max_workers=None, chunksize=4):
+    """Parse a batch of form texts, one process per core; results keep the input order
+
+    Call this from under an ``if __name__ == "__main__":`` guard: on Windows and macOS
+    the workers are spawned and re-import the calling script, which would otherwise
+    start the batch again in every worker.
+    """
+    texts = list(texts)
+    parse = partial(parse_race_form, verbose=False)
+
+    # A pool costs more than it saves for a single card
+    workers = min(max_workers or os.cpu_count() or 1, len(texts))
+    if workers <= 1:
+        return [parse(text) for text in texts]
+
+    # Patterns are compiled at import in src.parser: forked workers (Linux) inherit them,
+    # spawned workers (Windows, macOS) re-import src.parser and compile them once each
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse, texts, chunksize=chunksize))
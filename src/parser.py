@@ -1,98 +1,111 @@
 import pandas as pd
 import re
 
-def parse_race_form(text):
-    lines = text.splitlines()
-    dogs = []
-    current_race = {}
-    race_number = 0
+# Line patterns, compiled once at import
+# Race headers, dog entries and per-dog stat lines; lastgroup names the branch that matched
+RE_RACE_LINE = re.compile(
+    r"(?P<header>Race No\s+(?P<day>\d{1,2}) Oct (?P<year>\d{2}) (?P<time>\d{2}:\d{2}[AP]M) (?P<track>[A-Za-z ]+)\s+(?P<distance>\d+)m)"
+    r"|(?P<times>Best:\s*(?P<best>\d+\.\d+)\s+Sectional:\s*(?P<sectional>\d+\.\d+)\s+Last3:\s*\[(?P<last3>.*?)\])"
+    r"|(?P<margins>Margins:\s*\[(?P<margin_list>.*?)\])"
+    r"|(?P<dog>(?P<box>\d+)\.?\s*(?P<form_number>[0-9]{3,6})?(?P<raw_name>[A-Za-z'’\- ]+)\s+(?P<sex_age>\d+[a-z])\s+(?P<weight>[\d.]+)kg"
+    r"\s+(?P<draw>\d+)\s+(?P<trainer>[A-Za-z'’\- ]+)\s+(?P<wins>\d+)\s*-\s*(?P<places>\d+)\s*-\s*(?P<starts>\d+)"
+    r"\s+\$(?P<prize>[\d,]+)\s+(?P<rtc>\S+)\s+(?P<dlr>\S+)\s+(?P<dlw>\S+))"
+)
+_LINE_PREFIXES = ("Race No", "Best:", "Margins:")
+DOG_COLUMNS = (
+    "Box", "DogName", "FormNumber", "Trainer", "SexAge", "Weight", "Draw",
+    "CareerWins", "CareerPlaces", "CareerStarts", "PrizeMoney", "RTC", "DLR", "DLW"
+)
+RACE_COLUMNS = ("RaceNumber", "RaceDate", "RaceTime", "Track", "Distance")
+NARROW_INT_COLUMNS = ("Box", "Draw", "CareerWins", "CareerPlaces", "CareerStarts", "RaceNumber", "Distance")
+_DOG_FIELDS = (
+    "box", "form_number", "raw_name", "sex_age", "weight", "draw", "trainer",
+    "wins", "places", "starts", "prize", "rtc", "dlr", "dlw"
+)
 
-    for line in lines:
-        line = line.strip()
+def parse_race_form(text, verbose=True):
+    # Dog fields by column; race details and stat blocks are joined on at the end
+    columns = {name: [] for name in DOG_COLUMNS}
+    race_index = []
+    races = []
+    extras = {}
 
-        # Match race header
-        header_match = re.match(r"Race No\s+(\d{1,2}) Oct (\d{2}) (\d{2}:\d{2}[AP]M) ([A-Za-z ]+)\s+(\d+)m", line)
-        if header_match:
-            race_number += 1
-            day, year, time, track, distance = header_match.groups()
-            current_race = {
-                "RaceNumber": race_number,
-                "RaceDate": f"2025-10-{day.zfill(2)}",
-                "RaceTime": time,
-                "Track": track.strip(),
-                "Distance": int(distance)
-            }
+    match_line = RE_RACE_LINE.match
+
+    for line in map(str.strip, text.splitlines()):
+        # Skip lines no branch can match
+        if line[:1].isdigit():
+            if "kg" not in line:
+                continue
+        elif not line.startswith(_LINE_PREFIXES):
             continue
 
-        # Match dog entry with glued form number
-        dog_match = re.match(
-            r"""^(\d+)\.?\s*([0-9]{3,6})?([A-Za-z'’\- ]+)\s+(\d+[a-z])\s+([\d.]+)kg\s+(\d+)\s+([A-Za-z'’\- ]+)\s+(\d+)\s*-\s*(\d+)\s*-\s*(\d+)\s+\$([\d,]+)\s+(\S+)\s+(\S+)\s+(\S+)""",
-            line
-        )
+        # Match race header, dog entry, Best/Sectional/Last3 block or Margins block
+        line_match = match_line(line)
+        if not line_match:
+            continue
 
-        if dog_match:
+        kind = line_match.lastgroup
+        dog_count = len(race_index)
+        if kind == "header":
+            day, year, time, track, distance = line_match.group("day", "year", "time", "track", "distance")
+            races.append((len(races) + 1, f"2025-10-{day.zfill(2)}", time, track.strip(), int(distance)))
+        elif kind == "times" and dog_count:
+            extras.setdefault("BestTimeSec", {})[dog_count - 1] = float(line_match.group("best"))
+            extras.setdefault("SectionalSec", {})[dog_count - 1] = float(line_match.group("sectional"))
+            try:
+                last3 = [float(t.strip()) for t in line_match.group("last3").split(",")]
+            except:
+                last3 = []
+            extras.setdefault("Last3TimesSec", {})[dog_count - 1] = last3
+        elif kind == "margins" and dog_count:
+            try:
+                margins = [float(m.strip()) for m in line_match.group("margin_list").split(",")]
+            except:
+                margins = []
+            extras.setdefault("Margins", {})[dog_count - 1] = margins
+        elif kind == "dog":
+            # Dog entry with glued form number
             (
                 box, form_number, raw_name, sex_age, weight, draw, trainer,
                 wins, places, starts, prize, rtc, dlr, dlw
-            ) = dog_match.groups()
+            ) = line_match.group(*_DOG_FIELDS)
 
             dog_name = raw_name.strip()
             if form_number and dog_name.startswith(form_number[-2:]):
                 dog_name = dog_name[len(form_number[-2:]):].strip()
 
-            dogs.append({
-                "Box": int(box),
-                "DogName": dog_name,
-                "FormNumber": form_number or "",
-                "Trainer": trainer.strip(),
-                "SexAge": sex_age,
-                "Weight": float(weight),
-                "Draw": int(draw),
-                "CareerWins": int(wins),
-                "CareerPlaces": int(places),
-                "CareerStarts": int(starts),
-                "PrizeMoney": float(prize.replace(",", "")),
-                "RTC": rtc,
-                "DLR": dlr,
-                "DLW": dlw,
-                **current_race
-            })
-            continue
-
-        # Match Best/Sectional/Last3 block
-        time_match = re.match(
-            r"""Best:\s*(\d+\.\d+)\s+Sectional:\s*(\d+\.\d+)\s+Last3:\s*
-
-\[(.*?)\]
-
-""",
-            line
-        )
-        if time_match and dogs:
-            dogs[-1]["BestTimeSec"] = float(time_match.group(1))
-            dogs[-1]["SectionalSec"] = float(time_match.group(2))
-            try:
-                last3 = [float(t.strip()) for t in time_match.group(3).split(",")]
-                dogs[-1]["Last3TimesSec"] = last3
-            except:
-                dogs[-1]["Last3TimesSec"] = []
-
-        # Match Margins block
-        margin_match = re.match(
-            r"""Margins:\s*
-
-\[(.*?)\]
-
-""",
-            line
-        )
-        if margin_match and dogs:
-            try:
-                margins = [float(m.strip()) for m in margin_match.group(1).split(",")]
-                dogs[-1]["Margins"] = margins
-            except:
-                dogs[-1]["Margins"] = []
+            columns["Box"].append(int(box))
+            columns["DogName"].append(dog_name)
+            columns["FormNumber"].append(form_number or "")
+            columns["Trainer"].append(trainer.strip())
+            columns["SexAge"].append(sex_age)
+            columns["Weight"].append(float(weight))
+            columns["Draw"].append(int(draw))
+            columns["CareerWins"].append(int(wins))
+            columns["CareerPlaces"].append(int(places))
+            columns["CareerStarts"].append(int(starts))
+            columns["PrizeMoney"].append(float(prize.replace(",", "")))
+            columns["RTC"].append(rtc)
+            columns["DLR"].append(dlr)
+            columns["DLW"].append(dlw)
+            # Dogs listed before any race header have no race (-1)
+            race_index.append(len(races) - 1)
 
-    df = pd.DataFrame(dogs)
-    print(f"✅ Parsed {len(df)} dogs")
+    if not race_index:
+        df = pd.DataFrame()
+    else:
+        df = pd.DataFrame(columns)
+        if races and max(race_index) >= 0:
+            race_df = pd.DataFrame(races, columns=RACE_COLUMNS).reindex(race_index)
+            for name in race_df.columns:
+                df[name] = race_df[name].to_numpy()
+        for name, values in extras.items():
+            df[name] = pd.Series(values).reindex(df.index)
+    # Narrow integer columns
+    for col in NARROW_INT_COLUMNS:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    if verbose:
+        print(f"✅ Parsed {len(df)} dogs")
     return df
@@ -1,5 +1,6 @@
 # src/utils.py - Utility functions
 import os
+from pathlib import Path
 
 def setup_environment():
     """Setup and validate environment"""
@@ -7,10 +8,10 @@ def setup_environment():
     
     # Ensure outputs directory exists
     from config import OUTPUT_DIR
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    try:
+        Path(OUTPUT_DIR).mkdir(parents=True)
         print(f"✅ Created outputs directory: {OUTPUT_DIR}")
-    else:
+    except FileExistsError:
         print(f"✅ Outputs directory exists: {OUTPUT_DIR}")
     
     return True
@@ -1,5 +1,8 @@
 import os
 import pdfplumber
+from openpyxl import load_workbook
+
+from src.exporter import EXPORT_COLUMNS, export_to_excel
 
 def extract_text_from_latest_pdf(folder):
     if not os.path.exists(folder):
@@ -28,3 +31,16 @@ def extract_text_from_latest_pdf(folder):
 
     print(f"✅ Extracted text from {os.path.basename(pdf_path)}")
     return text
+
+def test_export_to_excel_keeps_recent_positions_on_a_second_export(tmp_path):
+    dogs = [{"DogsName": "Fast Dog", "recent_positions": [1, 2]}]
+    column = EXPORT_COLUMNS.index("recent_positions")
+
+    # The dogs are flattened in place, so the second export sees the joined string
+    for run in ("first", "second"):
+        folder = tmp_path / run
+        folder.mkdir()
+        export_to_excel(dogs, str(folder))
+        (workbook,) = folder.glob("*.xlsx")
+        rows = list(load_workbook(workbook, read_only=True).active.iter_rows(values_only=True))
+        assert rows[1][column] == "1, 2"
@@ -1,6 +1,8 @@
 import os
 import pdfplumber
 
+from src.parser import parse_race_form
+
 def extract_text_from_latest_pdf(folder):
     if not os.path.exists(folder):
         print(f"❌ Folder not found: {folder}")
@@ -28,3 +30,20 @@ def extract_text_from_latest_pdf(folder):
 
     print(f"✅ Extracted text from {os.path.basename(pdf_path)}")
     return text
+
+def test_parse_race_form_reads_stat_lines_onto_the_preceding_dog():
+    text = "\n".join([
+        "Race No 1 12 Oct 25 07:15PM Angle Park 515m",
+        "1. 12345Fast Dog 2d 30.5kg 1 J Smith 3-2-10 $12,500 22.50 5 7",
+        "Best: 29.85 Sectional: 5.42 Last3: [30.10, 29.95, 30.02]",
+        "Margins: [1.5, 0.25, 3.0]",
+        "2. Slow Dog 3b 28.1kg 4 A Jones 0-1-6 $900 FSH 14 -",
+    ])
+    df = parse_race_form(text, verbose=False)
+
+    assert df.loc[0, "BestTimeSec"] == 29.85
+    assert df.loc[0, "SectionalSec"] == 5.42
+    assert df.loc[0, "Last3TimesSec"] == [30.10, 29.95, 30.02]
+    assert df.loc[0, "Margins"] == [1.5, 0.25, 3.0]
+    # A dog without stat lines keeps them missing
+    assert df.loc[1, ["BestTimeSec", "Last3TimesSec", "Margins"]].isna().all()
@@ -1,5 +1,8 @@
 import os
 import pdfplumber
+import pandas as pd
+
+from src.features import compute_features
 
 def extract_text_from_latest_pdf(folder):
     if not os.path.exists(folder):
@@ -28,3 +31,26 @@ def extract_text_from_latest_pdf(folder):
 
     print(f"✅ Extracted text from {os.path.basename(pdf_path)}")
     return text
+
+def _dogs(index):
+    return pd.DataFrame({
+        "DLR": ["5", "FSH"],
+        "CareerStarts": [10, 90],
+        "CareerWins": [3, 0],
+        "Distance": [515, 380],
+        "PrizeMoney": [12500.0, 900.0],
+    }, index=index)
+
+def test_compute_features_fills_fallbacks_on_a_non_default_index():
+    df = compute_features(_dogs([10, 11]))
+
+    assert df["TrainerStrikeRate"].tolist() == [0.15, 0.15]
+    assert df["RestFactor"].tolist() == [0.8, 0.8]
+    assert df["FinalScore"].notna().all()
+
+def test_compute_features_keeps_existing_fallback_columns():
+    dogs = _dogs([10, 11]).assign(TrainerStrikeRate=[0.3, 0.25])
+    df = compute_features(dogs)
+
+    assert df["TrainerStrikeRate"].tolist() == [0.3, 0.25]
+    assert df["RestFactor"].tolist() == [0.8, 0.8]